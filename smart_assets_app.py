@@ -3,9 +3,17 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+import os
 import re
 import numpy as np
 
+from utils.assistant_memory import AnswerCache, ChatHistory
+from utils.background_loader import BackgroundLoader
+from utils.maintenance_planner import plan_maintenance, summarize_plan, export_plan
+from utils.report_views import ReportViews
+from utils.shared_cache import SharedDataCache
+from utils.snapshot_store import SnapshotStore, diff_snapshots
+
 # تهيئة الصفحة
 st.set_page_config(
     page_title="النظام الذكي لإدارة الأصول",
@@ -68,32 +76,101 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+DATA_FILE = "data/SGS_AutoGPT_Assets_Template_MoF.xlsx"
+LOAD_REFRESH_SECONDS = 0.5
+CHAT_HISTORY_LIMIT = 10
+TABLE_PAGE_SIZE = 100
+CHAT_SPILL_PATH = None  # مسار ملف JSONL لحفظ الرسائل الأقدم (اختياري)
+
+@st.cache_resource
+def get_shared_cache():
+    """ذاكرة مشتركة واحدة لكل عملية تتقاسمها جميع الجلسات"""
+    return SharedDataCache()
+
+def data_source_key():
+    """مفتاح نسخة البيانات: مسار الملف وتاريخ تعديله، أو البيانات النموذجية"""
+    if os.path.exists(DATA_FILE):
+        return (DATA_FILE, os.path.getmtime(DATA_FILE))
+    return ("sample", 0)
+
+def sync_shared_data(shared):
+    """
+    إضافة الدفعات التي وصلت من المحمّل الخلفي إلى البيانات المشتركة،
+    وتحديث التقارير المجهزة تدريجياً بالصفوف الجديدة فقط.
+    مدير الأصول وتقاريره يُنشران معاً كزوج واحد باستبدال المرجع، ولا يُعدّل المنشور أبداً.
+    تُعيد ((مدير الأصول، التقارير) أو None، هل اكتمل التحميل).
+    """
+    with shared.lock:
+        # قراءة حالة الانتهاء قبل السحب تضمن عدم فقدان آخر دفعة
+        finished = shared.loader.done
+        chunks = shared.loader.drain()
+        
+        if chunks:
+            new_rows = pd.concat(chunks, ignore_index=True)
+            published = shared.get("published")
+            if published is None:
+                manager, views = SmartAssetManager(new_rows), ReportViews()
+            else:
+                manager, views = published[0].with_rows(new_rows), published[1]
+            shared.set("published", (manager, views.refreshed(manager.df)))
+        
+        return shared.get("published"), finished
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def cached_maintenance_plan(data_version, budget, custodian_cap, _df):
+    """خطة الصيانة محفوظة لكل (نسخة بيانات، ميزانية، سقف)"""
+    return plan_maintenance(_df, budget, custodian_cap)
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def cached_plan_export(data_version, budget, custodian_cap, _plan):
+    """ملف Excel للخطة يُبنى مرة واحدة لكل (نسخة بيانات، ميزانية، سقف)"""
+    return export_plan(_plan)
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_snapshot_diff(old_label, new_label, old_mtime, new_mtime):
+    """مقارنة نسختين محفوظة لكل (اسمي النسختين، وقتي تعديل الملفين)"""
+    store = SnapshotStore()
+    return diff_snapshots(store.load(old_label), store.load(new_label))
+
 class SmartAssetManager:
-    def __init__(self, df):
+    def __init__(self, df, prepared=False):
         self.df = df
-        self.setup_data()
+        self._assistant_aggregates = None
+        if not prepared:
+            self.setup_data()
     
     def setup_data(self):
         """تحضير البيانات للاستخدام"""
+        self.df = self.prepare_data(self.df)
+    
+    def prepare_data(self, df):
+        """تنظيف دفعة من البيانات وإضافة الأعمدة المحسوبة"""
         try:
             # تنظيف البيانات الأساسية
-            self.df['Cost'] = pd.to_numeric(self.df['Cost'], errors='coerce').fillna(0)
-            self.df['Net Book Value'] = pd.to_numeric(self.df['Net Book Value'], errors='coerce').fillna(0)
-            self.df['Remaining useful life'] = pd.to_numeric(self.df['Remaining useful life'], errors='coerce').fillna(0)
+            df['Cost'] = pd.to_numeric(df['Cost'], errors='coerce').fillna(0)
+            df['Net Book Value'] = pd.to_numeric(df['Net Book Value'], errors='coerce').fillna(0)
+            df['Remaining useful life'] = pd.to_numeric(df['Remaining useful life'], errors='coerce').fillna(0)
             
             # إضافة أعمدة محسوبة
-            self.df['Maintenance Priority'] = self.df['Remaining useful life'].apply(
+            df['Maintenance Priority'] = df['Remaining useful life'].apply(
                 lambda x: 'عالي' if x < 1 else 'متوسط' if x < 2 else 'منخفض'
             )
             
             # تنظيف النصوص العربية
             text_columns = ['Asset Description', 'City', 'Custodian']
             for col in text_columns:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].fillna('غير محدد').astype(str)
+                if col in df.columns:
+                    df[col] = df[col].fillna('غير محدد').astype(str)
             
         except Exception as e:
             st.error(f"خطأ في تحضير البيانات: {e}")
+        
+        return df
+    
+    def with_rows(self, chunk):
+        """مدير جديد يضم دفعة إضافية (تُحضّر الدفعة الجديدة فقط)؛ المدير الحالي لا يتغير"""
+        chunk = self.prepare_data(chunk)
+        return SmartAssetManager(pd.concat([self.df, chunk], ignore_index=True), prepared=True)
     
     def smart_search(self, query):
         """بحث ذكي في الأصول"""
@@ -212,6 +289,36 @@ class SmartAssetManager:
         
         return recommendations
     
+    def get_assistant_aggregates(self):
+        """إحصائيات مجمعة للمساعد الذكي تُحسب مرة واحدة لكل نسخة بيانات"""
+        # الإحصائيات محفوظة مع الإطار الذي حُسبت منه
+        df = self.df
+        cached = self._assistant_aggregates
+        if cached is None or cached[0] is not df:
+            priority_counts = df['Maintenance Priority'].value_counts()
+            is_high = df['Maintenance Priority'] == 'عالي'
+            city_stats = pd.DataFrame({
+                'count': df.groupby('City').size(),
+                'value': df.groupby('City')['Net Book Value'].sum(),
+                'high_priority': is_high.groupby(df['City']).sum()
+            })
+            
+            aggregates = {
+                'total_assets': len(df),
+                'total_value': df['Net Book Value'].sum(),
+                'high_priority': int(priority_counts.get('عالي', 0)),
+                'medium_priority': int(priority_counts.get('متوسط', 0)),
+                'cities': city_stats.to_dict('index'),
+                'avg_cost': df['Cost'].mean(),
+                'max_cost': df['Cost'].max(),
+                'min_cost': df['Cost'].min(),
+                'avg_life': df['Remaining useful life'].mean(),
+                'old_assets': int((df['Remaining useful life'] < 1).sum())
+            }
+            cached = (df, aggregates)
+            self._assistant_aggregates = cached
+        return cached[1]
+    
     def get_department_analysis(self):
         """تحليل الأقسام"""
         try:
@@ -285,18 +392,59 @@ def main():
     # العنوان الرئيسي
     st.markdown('<h1 class="main-header">🏢 النظام الذكي لإدارة الأصول</h1>', unsafe_allow_html=True)
     
-    # تحميل البيانات
-    with st.spinner('📂 جاري تحميل بيانات الأصول...'):
-        df = load_sample_data()
+    # حجز نسخة البيانات المشتركة (تُحمّل في الخلفية مرة واحدة لكل العملية)
+    data_key = data_source_key()
+    lease = st.session_state.get("data_lease")
+    if lease is None or lease.key != data_key:
+        st.session_state.data_lease = get_shared_cache().lease(
+            data_key, lambda: BackgroundLoader.from_source(DATA_FILE, load_sample_data).start()
+        )
+    shared = st.session_state.data_lease.entry
+    loader = shared.loader
+    
+    if shared.get("published") is None:
+        # عند البدء: البيانات الصغيرة تكتمل فوراً دون انتظار المهلة كاملة
+        loader.wait(LOAD_REFRESH_SECONDS)
+    
+    # الجلسة تحتفظ فقط بحالة الفلاتر؛ البيانات والتقارير مشتركة وتُوسّع تدريجياً
+    published, loaded = sync_shared_data(shared)
+    
+    if loaded and loader.error:
+        # لا نُبقي نسخة معطوبة أو جزئية في الذاكرة المشتركة؛ الحجز التالي يعيد التحميل
+        get_shared_cache().discard(data_key, shared)
+        del st.session_state.data_lease
+        st.error(f"❌ خطأ أثناء تحميل البيانات: {loader.error}")
+        if st.button("🔄 إعادة المحاولة"):
+            st.rerun()
+        return
+    
+    if not loaded:
+        st.info(f"📂 جاري تحميل بيانات الأصول... ({loader.rows_loaded} أصل حتى الآن)")
     
-    if df.empty:
-        st.error("❌ لم يتم تحميل البيانات بنجاح. يرجى التحقق من الملف.")
+    if published is None:
+        if loaded:
+            st.error("❌ لم يتم تحميل البيانات بنجاح. يرجى التحقق من الملف.")
+        else:
+            schedule_refresh(loader)
         return
     
+    # زوج متسق من نسخة واحدة: التقارير تفهرس إطار المدير نفسه
+    asset_manager, report_views = published
+    df = asset_manager.df
+    data_version = (data_key, len(df))
+    
+    # حفظ نسخة تلقائياً مرة واحدة لكل نسخة بيانات محملة (عدا البيانات النموذجية)
+    # الحفظ الفاشل لا يُخزن، فيُعاد في التشغيل التالي
+    if loaded and data_key[0] != "sample":
+        try:
+            shared.get_or_build("snapshot_label", lambda: SnapshotStore().save(df))
+        except Exception as e:
+            st.warning(f"⚠️ تعذر حفظ نسخة من سجل الأصول: {e}")
+    
     # عرض معلومات أساسية عن البيانات
     st.sidebar.info(f"📊 تم تحميل {len(df)} أصل")
     
-    asset_manager = SmartAssetManager(df)
+    answer_cache = shared.get_or_build("answer_cache", AnswerCache)
     
     # الشريط الجانبي
     with st.sidebar:
@@ -337,25 +485,24 @@ def main():
         display_search(asset_manager, search_query, selected_city, selected_department, min_cost, max_cost, priority_filter)
     
     with tab3:
-        display_reports(asset_manager)
+        display_reports(asset_manager, report_views, data_version, loaded)
     
     with tab4:
-        display_ai_assistant(asset_manager)
+        display_ai_assistant(asset_manager, answer_cache, data_version)
     
     with tab5:
         display_about()
-
-def display_dashboard(asset_manager):
-    """عرض لوحة التحكم"""
-    st.header("📊 لوحة التحكم الذكية")
-    
-    insights = asset_manager.get_asset_insights()
-    
-    if not insights:
-        st.error("لا توجد بيانات كافية لعرض التحليلات")
-        return
     
-    # بطاقات الإحصائيات
+    if not loaded:
+        schedule_refresh(loader)
+
+def schedule_refresh(loader):
+    """إعادة التشغيل بعد عرض الصفحة كاملة، فور انتهاء التحميل أو بعد المهلة"""
+    loader.wait(LOAD_REFRESH_SECONDS)
+    st.rerun()
+
+def display_metric_cards(insights):
+    """بطاقات الإحصائيات"""
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
@@ -389,21 +536,36 @@ def display_dashboard(asset_manager):
             <h2>{insights['medium_priority']}</h2>
         </div>
         """, unsafe_allow_html=True)
+
+def display_city_distribution(insights):
+    """توزيع الأصول حسب المدينة"""
+    if not insights['city_distribution'].empty:
+        fig = px.pie(
+            values=insights['city_distribution'].values,
+            names=insights['city_distribution'].index,
+            title="🏙️ توزيع الأصول حسب المدينة",
+            color_discrete_sequence=px.colors.qualitative.Set3
+        )
+        fig.update_traces(textposition='inside', textinfo='percent+label')
+        st.plotly_chart(fig, use_container_width=True)
+
+def display_dashboard(asset_manager):
+    """عرض لوحة التحكم"""
+    st.header("📊 لوحة التحكم الذكية")
+    
+    insights = asset_manager.get_asset_insights()
+    
+    if not insights:
+        st.error("لا توجد بيانات كافية لعرض التحليلات")
+        return
+    
+    display_metric_cards(insights)
     
     # الرسوم البيانية
     col1, col2 = st.columns(2)
     
     with col1:
-        # توزيع الأصول حسب المدينة
-        if not insights['city_distribution'].empty:
-            fig = px.pie(
-                values=insights['city_distribution'].values,
-                names=insights['city_distribution'].index,
-                title="🏙️ توزيع الأصول حسب المدينة",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
+        display_city_distribution(insights)
     
     with col2:
         # توزيع الأولويات
@@ -508,7 +670,17 @@ def display_search(asset_manager, search_query, selected_city, selected_departme
         available_columns = [col for col in display_columns if col in filtered_df.columns]
         st.dataframe(filtered_df[available_columns], use_container_width=True)
 
-def display_reports(asset_manager):
+def display_paged_table(df, key, page_size=TABLE_PAGE_SIZE):
+    """عرض جدول على صفحات بدل إرسال جميع الصفوف إلى المتصفح"""
+    pages = max(1, -(-len(df) // page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input("الصفحة:", min_value=1, max_value=pages, value=1, step=1, key=f"{key}_page")
+        st.caption(f"الصفحة {page} من {pages} ({len(df)} صف)")
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[start:start + page_size], use_container_width=True)
+
+def display_reports(asset_manager, views, data_version, loaded):
     """عرض التقارير"""
     st.header("📊 التقارير الذكية")
     
@@ -540,41 +712,118 @@ def display_reports(asset_manager):
             )
             st.plotly_chart(fig, use_container_width=True)
     
+    # خطة الصيانة ضمن الميزانية
+    st.subheader("🛠️ خطة الصيانة ضمن الميزانية")
+    col1, col2 = st.columns(2)
+    with col1:
+        budget = st.number_input("الميزانية السنوية لكل قسم ومدينة:", min_value=0, value=1000, step=100)
+    with col2:
+        custodian_cap = st.number_input("سقف الإنفاق لكل جهة عهدة (0 = بدون):", min_value=0, value=0, step=100)
+    
+    plan = cached_maintenance_plan(data_version, budget, custodian_cap, asset_manager.df)
+    
+    if plan.empty:
+        st.info("لا توجد أصول ضمن الميزانية المحددة")
+    else:
+        st.write(f"📌 {len(plan)} أصل بتكلفة إجمالية {plan['Cost'].sum():,.0f} ريال")
+        st.dataframe(summarize_plan(plan), use_container_width=True)
+        display_paged_table(plan, key="plan")
+        
+        # ملف Excel يُبنى عند الطلب فقط
+        if st.checkbox("📥 تجهيز ملف Excel لخطة الصيانة"):
+            st.download_button(
+                "📥 تصدير خطة الصيانة إلى Excel",
+                data=cached_plan_export(data_version, budget, custodian_cap, plan),
+                file_name="maintenance_plan.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+    
+    # التغييرات بين النسخ الشهرية
+    display_snapshot_changes(asset_manager, loaded)
+    
     # تقرير تفصيلي
     st.subheader("📋 التقرير التفصيلي")
     
-    report_type = st.selectbox("اختر نوع التقرير:", [
-        "جميع الأصول",
-        "الأصول ذات الأولوية العالية", 
-        "الأصول حسب المدينة",
-        "الأصول حسب القسم",
-        "الأصول منخفضة التكلفة",
-        "الأصول مرتفعة التكلفة"
-    ])
+    report_views = {
+        "جميع الأصول": "all",
+        "الأصول ذات الأولوية العالية": "high_priority",
+        "الأصول حسب المدينة": "by_city",
+        "الأصول حسب القسم": "by_department",
+        "الأصول منخفضة التكلفة": "low_cost",
+        "الأصول مرتفعة التكلفة": "high_cost"
+    }
+    report_type = st.selectbox("اختر نوع التقرير:", list(report_views.keys()))
+    view = report_views[report_type]
     
-    if report_type == "الأصول ذات الأولوية العالية":
-        report_df = asset_manager.df[asset_manager.df['Maintenance Priority'] == 'عالي']
-    elif report_type == "الأصول حسب المدينة":
-        selected_city = st.selectbox("اختر المدينة:", asset_manager.df['City'].unique())
-        report_df = asset_manager.df[asset_manager.df['City'] == selected_city]
-    elif report_type == "الأصول حسب القسم":
-        selected_dept = st.selectbox("اختر القسم:", asset_manager.df['Custodian'].unique())
-        report_df = asset_manager.df[asset_manager.df['Custodian'] == selected_dept]
-    elif report_type == "الأصول منخفضة التكلفة":
-        report_df = asset_manager.df[asset_manager.df['Cost'] < asset_manager.df['Cost'].median()]
-    elif report_type == "الأصول مرتفعة التكلفة":
-        report_df = asset_manager.df[asset_manager.df['Cost'] > asset_manager.df['Cost'].median()]
-    else:
-        report_df = asset_manager.df
+    key = None
+    if view == "by_city":
+        key = st.selectbox("اختر المدينة:", views.group_keys(view))
+    elif view == "by_department":
+        key = st.selectbox("اختر القسم:", views.group_keys(view))
     
-    st.dataframe(report_df, use_container_width=True)
+    summary = views.summary(view, key)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("عدد الأصول", summary['count'])
+    col2.metric("التكلفة الإجمالية", f"{summary['total_cost']:,.0f} ريال")
+    col3.metric("القيمة الدفترية", f"{summary['total_value']:,.0f} ريال")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        page_size = st.selectbox("عدد الصفوف في الصفحة:", [50, 100, 500], index=1)
+    with col2:
+        page = st.number_input("الصفحة:", min_value=1, max_value=views.page_count(view, key, page_size), value=1, step=1)
+    
+    st.dataframe(views.page(view, key, page, page_size), use_container_width=True)
     
     # خيارات التصدير
     if st.button("📥 تصدير التقرير إلى Excel"):
         # محاكاة التصدير (في التطبيق الحقيقي سيتم إنشاء ملف Excel)
         st.success("✅ تم تصدير التقرير بنجاح!")
 
-def display_ai_assistant(asset_manager):
+def display_snapshot_changes(asset_manager, loaded):
+    """تقرير التغييرات بين نسختين من سجل الأصول"""
+    st.subheader("🗓️ التغييرات منذ النسخة السابقة")
+    store = SnapshotStore()
+    
+    # الحفظ اليدوي متاح بعد اكتمال التحميل فقط، حتى لا تُستبدل نسخة الشهر ببيانات جزئية
+    if loaded and st.button("💾 حفظ نسخة من السجل الحالي"):
+        label = store.save(asset_manager.df)
+        st.success(f"✅ تم حفظ النسخة {label}")
+    
+    snapshots = store.list_snapshots()
+    if len(snapshots) < 2:
+        st.info("💡 يلزم وجود نسختين محفوظتين على الأقل لعرض التغييرات")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        old_label = st.selectbox("النسخة السابقة:", snapshots, index=len(snapshots) - 2)
+    with col2:
+        new_label = st.selectbox("النسخة الحالية:", snapshots, index=len(snapshots) - 1)
+    
+    try:
+        changes = cached_snapshot_diff(old_label, new_label, store.mtime(old_label), store.mtime(new_label))
+    except Exception as e:
+        st.error(f"خطأ في مقارنة النسخ: {e}")
+        return
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("➕ أصول مضافة", len(changes['added']))
+    col2.metric("➖ أصول مستبعدة", len(changes['retired']))
+    col3.metric("🔁 نقل عهدة", len(changes['transfers']))
+    col4.metric("📉 تغير القيمة الدفترية", f"{changes['nbv_total_delta']:,.0f} ريال")
+    
+    tab_added, tab_retired, tab_transfers, tab_nbv = st.tabs(["المضافة", "المستبعدة", "نقل العهدة", "القيمة الدفترية"])
+    with tab_added:
+        display_paged_table(changes['added'], key="snapshot_added")
+    with tab_retired:
+        display_paged_table(changes['retired'], key="snapshot_retired")
+    with tab_transfers:
+        display_paged_table(changes['transfers'], key="snapshot_transfers")
+    with tab_nbv:
+        display_paged_table(changes['nbv_changes'], key="snapshot_nbv")
+
+def display_ai_assistant(asset_manager, answer_cache, data_version):
     """عرض المساعد الذكي"""
     st.header("🤖 المساعد الذكي للأصول")
     
@@ -587,9 +836,23 @@ def display_ai_assistant(asset_manager):
     - تحليل التكاليف
     """)
     
-    # تهيئة سجل المحادثة
+    # تهيئة سجل المحادثة (محدود الحجم)
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        st.session_state.chat_history = ChatHistory(CHAT_HISTORY_LIMIT, CHAT_SPILL_PATH)
+    
+    def ask(question):
+        # الإجابات مخزنة حسب نية السؤال ونسخة البيانات؛ الإجابات الفاشلة لا تُخزن
+        intent = parse_intent(question)
+        try:
+            response = answer_cache.get_or_compute(
+                (data_version, intent),
+                lambda: answer_intent(asset_manager, *intent)
+            )
+        except Exception as e:
+            response = f"❌ حدث خطأ في معالجة سؤالك: {e}"
+        st.session_state.chat_history.append("user", question)
+        st.session_state.chat_history.append("assistant", response)
+        st.rerun()
     
     # أمثلة سريعة
     st.subheader("🔄 استعلامات سريعة")
@@ -597,18 +860,15 @@ def display_ai_assistant(asset_manager):
     
     with col1:
         if st.button("🔄 الأصول العاجلة"):
-            st.session_state.chat_history.append({"role": "user", "message": "ما هي الأصول التي تحتاج صيانة عاجلة؟"})
-            st.rerun()
+            ask("ما هي الأصول التي تحتاج صيانة عاجلة؟")
     
     with col2:
         if st.button("📊 إحصائيات عامة"):
-            st.session_state.chat_history.append({"role": "user", "message": "اعطني إحصائيات الأصول"})
-            st.rerun()
+            ask("اعطني إحصائيات الأصول")
     
     with col3:
         if st.button("🏙️ أصول جدة"):
-            st.session_state.chat_history.append({"role": "user", "message": "ما هي الأصول في جدة؟"})
-            st.rerun()
+            ask("ما هي الأصول في جدة؟")
     
     # إدخال المستخدم
     user_input = st.text_input(
@@ -620,13 +880,7 @@ def display_ai_assistant(asset_manager):
     col1, col2 = st.columns([3, 1])
     with col2:
         if st.button("إرسال 🚀") and user_input:
-            # إضافة سؤال المستخدم للسجل
-            st.session_state.chat_history.append({"role": "user", "message": user_input})
-            
-            # توليد رد المساعد
-            response = generate_ai_response(asset_manager, user_input)
-            st.session_state.chat_history.append({"role": "assistant", "message": response})
-            st.rerun()
+            ask(user_input)
     
     # عرض سجل المحادثة
     st.subheader("💬 سجل المحادثة")
@@ -634,7 +888,7 @@ def display_ai_assistant(asset_manager):
     if not st.session_state.chat_history:
         st.write("💭 لم تبدأ المحادثة بعد. استخدم الأزرار أعلاه أو اكتب سؤالك.")
     else:
-        for chat in st.session_state.chat_history[-10:]:  # آخر 10 رسائل
+        for chat in st.session_state.chat_history:
             if chat["role"] == "user":
                 st.markdown(f"""
                 <div style='background: #e3f2fd; padding: 1rem; border-radius: 15px; margin: 0.5rem 0; border-right: 4px solid #1f77b4;'>
@@ -650,49 +904,61 @@ def display_ai_assistant(asset_manager):
     
     # زر مسح المحادثة
     if st.button("🗑️ مسح المحادثة"):
-        st.session_state.chat_history = []
+        st.session_state.chat_history.clear()
         st.rerun()
 
+def parse_intent(query):
+    """تحديد نية السؤال (ومعاملها إن وجد) لاستخدامها كمفتاح للإجابة"""
+    query = query.lower()
+    city = 'جدة' if 'جدة' in query else 'الرياض' if 'الرياض' in query else None
+    
+    if any(word in query for word in ['صيانة', 'عاجل', 'أولوية', 'عاجلة']):
+        return ('maintenance', None)
+    elif any(word in query for word in ['إحصائيات', 'أعداد', 'إجمالي', 'إحصائية']):
+        return ('statistics', city)
+    elif city:
+        return ('city', city)
+    elif any(word in query for word in ['تكلفة', 'سعر', 'ثمن', 'قيمة']):
+        return ('cost', None)
+    elif any(word in query for word in ['عمر', 'قديم', 'مستعمل', 'جديد']):
+        return ('life', None)
+    return ('help', None)
+
 def generate_ai_response(asset_manager, query):
     """توليد رد ذكي بناءً على الاستعلام"""
-    query = query.lower()
-    
     try:
-        if any(word in query for word in ['صيانة', 'عاجل', 'أولوية', 'عاجلة']):
-            high_priority = len(asset_manager.df[asset_manager.df['Maintenance Priority'] == 'عالي'])
-            medium_priority = len(asset_manager.df[asset_manager.df['Maintenance Priority'] == 'متوسط'])
-            return f"🔔 **توصيات الصيانة:**\n- الأصول ذات الأولوية العالية: {high_priority} أصل\n- الأصول ذات الأولوية المتوسطة: {medium_priority} أصل\n\nيوصى بمراجعة هذه الأصول قريباً."
-        
-        elif any(word in query for word in ['إحصائيات', 'أعداد', 'إجمالي', 'إحصائية']):
-            insights = asset_manager.get_asset_insights()
-            return f"📊 **الإحصائيات العامة:**\n- إجمالي الأصول: {insights['total_assets']}\n- القيمة الإجمالية: {insights['total_value']:,.0f} ريال\n- الأصول عالية الأولوية: {insights['high_priority']}\n- المدن: {len(insights['city_distribution'])} مدينة"
-        
-        elif any(word in query for word in ['جدة', 'الرياض']):
-            city = 'جدة' if 'جدة' in query else 'الرياض'
-            city_assets = asset_manager.df[asset_manager.df['City'] == city]
-            city_value = city_assets['Net Book Value'].sum()
-            high_priority_city = len(city_assets[city_assets['Maintenance Priority'] == 'عالي'])
-            
-            return f"🏙️ **أصول {city}:**\n- العدد: {len(city_assets)} أصل\n- القيمة: {city_value:,.0f} ريال\n- الأصول عالية الأولوية: {high_priority_city} أصل"
-        
-        elif any(word in query for word in ['تكلفة', 'سعر', 'ثمن', 'قيمة']):
-            avg_cost = asset_manager.df['Cost'].mean()
-            max_cost = asset_manager.df['Cost'].max()
-            min_cost = asset_manager.df['Cost'].min()
-            
-            return f"💰 **تحليل التكاليف:**\n- متوسط التكلفة: {avg_cost:,.0f} ريال\n- أعلى تكلفة: {max_cost:,.0f} ريال\n- أدنى تكلفة: {min_cost:,.0f} ريال"
+        return answer_intent(asset_manager, *parse_intent(query))
+    except Exception as e:
+        return f"❌ حدث خطأ في معالجة سؤالك: {e}"
+
+def answer_intent(asset_manager, intent, param):
+    """صياغة الإجابة من الإحصائيات المجمعة (تُطلق استثناء عند الفشل)"""
+    stats = asset_manager.get_assistant_aggregates()
+    
+    if intent == 'maintenance':
+        return f"🔔 **توصيات الصيانة:**\n- الأصول ذات الأولوية العالية: {stats['high_priority']} أصل\n- الأصول ذات الأولوية المتوسطة: {stats['medium_priority']} أصل\n\nيوصى بمراجعة هذه الأصول قريباً."
+    
+    elif intent == 'statistics' and param:
+        city_stats = stats['cities'].get(param, {'count': 0, 'value': 0, 'high_priority': 0})
         
-        elif any(word in query for word in ['عمر', 'قديم', 'مستعمل', 'جديد']):
-            avg_life = asset_manager.df['Remaining useful life'].mean()
-            old_assets = len(asset_manager.df[asset_manager.df['Remaining useful life'] < 1])
-            
-            return f"⏳ **تحليل الأعمار:**\n- متوسط العمر المتبقي: {avg_life:.1f} سنة\n- الأصول التي عمرها أقل من سنة: {old_assets} أصل"
+        return f"📊 **إحصائيات {param}:**\n- إجمالي الأصول: {city_stats['count']} من {stats['total_assets']}\n- القيمة الإجمالية: {city_stats['value']:,.0f} ريال\n- الأصول عالية الأولوية: {city_stats['high_priority']}"
+    
+    elif intent == 'statistics':
+        return f"📊 **الإحصائيات العامة:**\n- إجمالي الأصول: {stats['total_assets']}\n- القيمة الإجمالية: {stats['total_value']:,.0f} ريال\n- الأصول عالية الأولوية: {stats['high_priority']}\n- المدن: {len(stats['cities'])} مدينة"
+    
+    elif intent == 'city':
+        city_stats = stats['cities'].get(param, {'count': 0, 'value': 0, 'high_priority': 0})
         
-        else:
-            return "🤔 **المساعد:** يمكنني مساعدتك في:\n- معلومات الصيانة والأولويات\n- إحصائيات الأصول العامة\n- البحث حسب المدينة\n- تحليل التكاليف والأعمار\n\n💡 **جرب:** 'ما هي الأصول العاجلة؟' أو 'اعطني إحصائيات جدة'"
+        return f"🏙️ **أصول {param}:**\n- العدد: {city_stats['count']} أصل\n- القيمة: {city_stats['value']:,.0f} ريال\n- الأصول عالية الأولوية: {city_stats['high_priority']} أصل"
     
-    except Exception as e:
-        return f"❌ حدث خطأ في معالجة سؤالك: {e}"
+    elif intent == 'cost':
+        return f"💰 **تحليل التكاليف:**\n- متوسط التكلفة: {stats['avg_cost']:,.0f} ريال\n- أعلى تكلفة: {stats['max_cost']:,.0f} ريال\n- أدنى تكلفة: {stats['min_cost']:,.0f} ريال"
+    
+    elif intent == 'life':
+        return f"⏳ **تحليل الأعمار:**\n- متوسط العمر المتبقي: {stats['avg_life']:.1f} سنة\n- الأصول التي عمرها أقل من سنة: {stats['old_assets']} أصل"
+    
+    else:
+        return "🤔 **المساعد:** يمكنني مساعدتك في:\n- معلومات الصيانة والأولويات\n- إحصائيات الأصول العامة\n- البحث حسب المدينة\n- تحليل التكاليف والأعمار\n\n💡 **جرب:** 'ما هي الأصول العاجلة؟' أو 'اعطني إحصائيات جدة'"
 
 def display_about():
     """صفحة عن النظام"""
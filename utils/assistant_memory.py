@@ -0,0 +1,55 @@
+import json
+import threading
+from collections import OrderedDict, deque
+
+
+class ChatHistory:
+    """
+    سجل محادثة محدود الحجم (ring buffer). الرسائل الأقدم تُحذف من الذاكرة،
+    ويمكن حفظها في ملف JSONL عند تمرير spill_path.
+    """
+
+    def __init__(self, maxlen: int = 10, spill_path: str = None):
+        self._messages = deque(maxlen=maxlen)
+        self.spill_path = spill_path
+
+    def append(self, role: str, message: str):
+        if self.spill_path and len(self._messages) == self._messages.maxlen:
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(self._messages[0], ensure_ascii=False) + "\n")
+        self._messages.append({"role": role, "message": message})
+
+    def clear(self):
+        self._messages.clear()
+
+    def __iter__(self):
+        return iter(list(self._messages))
+
+    def __len__(self):
+        return len(self._messages)
+
+
+class AnswerCache:
+    """
+    ذاكرة إجابات المساعد مفهرسة بـ (نسخة البيانات، نية السؤال)، مع حذف الأقدم استخداماً.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._answers = OrderedDict()
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            if key in self._answers:
+                self._answers.move_to_end(key)
+                return self._answers[key]
+
+        answer = compute()
+
+        with self._lock:
+            self._answers[key] = answer
+            self._answers.move_to_end(key)
+            while len(self._answers) > self.max_entries:
+                self._answers.popitem(last=False)
+        return answer
@@ -0,0 +1,90 @@
+import os
+import threading
+
+import pandas as pd
+
+from utils.data_loader import clean_asset_data
+
+
+def iter_excel_chunks(file_path: str, chunk_size: int = 5000, sheet_name: str = "Assets"):
+    """
+    قراءة ملف Excel على دفعات باستخدام وضع القراءة فقط في openpyxl،
+    بحيث لا ننتظر تحليل الملف كاملاً قبل عرض أول النتائج.
+    """
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        rows = workbook[sheet_name].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(col) if col is not None else "" for col in header]
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= chunk_size:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+
+class BackgroundLoader:
+    """
+    تحميل بيانات الأصول في خيط خلفي مع نشر الدفعات المنظفة أولاً بأول.
+    المستهلك يسحب الدفعات الجديدة فقط عبر drain() ويضيفها إلى ما لديه.
+    """
+
+    def __init__(self, chunks):
+        self._chunks = chunks
+        self._lock = threading.Lock()
+        self._pending = []
+        self._rows = 0
+        self.done = False
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @classmethod
+    def from_source(cls, file_path: str, fallback, chunk_size: int = 5000):
+        """ملف Excel إذا كان موجوداً، وإلا دالة البيانات البديلة كدفعة واحدة"""
+        if file_path and os.path.exists(file_path):
+            return cls(lambda: iter_excel_chunks(file_path, chunk_size))
+        return cls(lambda: iter([fallback()]))
+
+    def start(self):
+        if not self._thread.is_alive() and not self.done:
+            self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            for chunk in self._chunks():
+                chunk = clean_asset_data(chunk)
+                if chunk.empty:
+                    continue
+                with self._lock:
+                    self._pending.append(chunk)
+                    self._rows += len(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def wait(self, timeout: float):
+        """انتظار انتهاء التحميل لمدة أقصاها timeout ثانية (يعود فوراً عند الانتهاء)"""
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+
+    @property
+    def rows_loaded(self) -> int:
+        return self._rows
+
+    def drain(self) -> list:
+        """الدفعات التي وصلت منذ آخر استدعاء (تُسلّم مرة واحدة فقط)"""
+        with self._lock:
+            chunks, self._pending = self._pending, []
+            return chunks
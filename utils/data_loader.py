@@ -2,6 +2,31 @@ import pandas as pd
 import streamlit as st
 import os
 
+NUMERIC_COLS = ["Cost", "Net Book Value", "Depreciation amount", "Accumulated Depreciation", "Remaining useful life"]
+TEXT_COLS = ["Asset Description", "City", "Custodian"]
+
+
+def clean_asset_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    تنظيف DataFrame الأصول: أسماء الأعمدة، الصفوف الفارغة، القيم الرقمية والنصوص.
+    تُستخدم للملف الكامل ولكل دفعة أثناء التحميل التدريجي.
+    """
+    # تنظيف الأعمدة
+    df.columns = df.columns.astype(str).str.strip()
+    df = df.dropna(how="all")
+
+    # تحويل القيم الرقمية
+    for col in NUMERIC_COLS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
+
+    # معالجة النصوص الفارغة
+    for col in TEXT_COLS:
+        if col in df.columns:
+            df[col] = df[col].fillna("غير محدد").astype(str)
+
+    return df
+
 def load_asset_data(file_path: str = "SGS_AutoGPT_Assets_Template_MoF.xlsx") -> pd.DataFrame:
     """
     تحميل بيانات الأصول من ملف Excel أو Google Sheet (إذا تم توفير الرابط).
@@ -20,21 +45,7 @@ def load_asset_data(file_path: str = "SGS_AutoGPT_Assets_Template_MoF.xlsx") ->
                 return pd.DataFrame()
             df = pd.read_excel(file_path, sheet_name="Assets")
 
-        # تنظيف الأعمدة
-        df.columns = df.columns.str.strip()
-        df = df.dropna(how="all")
-
-        # تحويل القيم الرقمية
-        numeric_cols = ["Cost", "Net Book Value", "Depreciation amount", "Accumulated Depreciation", "Remaining useful life"]
-        for col in numeric_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
-
-        # معالجة النصوص الفارغة
-        text_cols = ["Asset Description", "City", "Custodian"]
-        for col in text_cols:
-            if col in df.columns:
-                df[col] = df[col].fillna("غير محدد").astype(str)
+        df = clean_asset_data(df)
 
         st.success("✅ تم تحميل بيانات الأصول بنجاح!")
         return df
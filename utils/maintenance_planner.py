@@ -0,0 +1,87 @@
+import io
+
+import numpy as np
+import pandas as pd
+
+PLAN_PRIORITIES = ["عالي", "متوسط"]
+
+PLAN_COLUMNS = [
+    "Tag number", "Asset Description", "City", "Custodian", "Cost",
+    "Net Book Value", "Remaining useful life", "Maintenance Priority", "Plan Score",
+]
+
+
+def score_candidates(df: pd.DataFrame) -> np.ndarray:
+    """
+    حساب درجة الأولوية لكل أصل بشكل متجهي (بدون حلقات).
+    الأصل الأقرب لنهاية عمره والأعلى قيمة دفترية نسبةً لتكلفته يحصل على درجة أعلى.
+    """
+    life = df["Remaining useful life"].to_numpy(dtype=float)
+    nbv = df["Net Book Value"].to_numpy(dtype=float)
+    cost = df["Cost"].to_numpy(dtype=float)
+
+    urgency = 1.0 / (1.0 + np.clip(life, 0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value_ratio = np.where(cost > 0, nbv / cost, 1.0)
+    return urgency * (1.0 + np.clip(value_ratio, 0, 1))
+
+
+def plan_maintenance(
+    df: pd.DataFrame,
+    budget: float,
+    custodian_cap: float = 0,
+    group_cols=("Custodian", "City"),
+) -> pd.DataFrame:
+    """
+    اختيار الأصول المرشحة للصيانة ضمن الميزانية السنوية لكل (قسم، مدينة)
+    مع سقف إنفاق اختياري لكل جهة عهدة (custodian_cap = 0 يعني بدون سقف).
+    الاختيار جشع حسب نسبة الدرجة إلى التكلفة، والأصل الذي لا يتسع له المتبقي يُتخطى
+    ليُفسح المجال لأصول أصغر بعده.
+    """
+    # القيود الدائنة (تكلفة سالبة) ليست أعمال صيانة، وقبولها كان سيعيد المبلغ للميزانية
+    candidates = df[df["Maintenance Priority"].isin(PLAN_PRIORITIES) & (df["Cost"] >= 0)]
+    if candidates.empty or budget <= 0:
+        return pd.DataFrame(columns=PLAN_COLUMNS)
+
+    scores = score_candidates(candidates)
+    cost = candidates["Cost"].to_numpy(dtype=float)
+    ratio = np.where(cost > 0, scores / np.where(cost > 0, cost, 1), np.inf)
+
+    # ترميز المجموعات والجهات كأرقام صحيحة لتسريع الحلقة
+    group_codes = candidates.groupby(list(group_cols), sort=False).ngroup().to_numpy()
+    custodian_codes, _ = pd.factorize(candidates["Custodian"])
+
+    group_left = np.full(group_codes.max() + 1, float(budget))
+    cap_left = np.full(custodian_codes.max() + 1, float(custodian_cap) if custodian_cap > 0 else np.inf)
+
+    order = np.argsort(-ratio, kind="stable")
+    selected = np.zeros(len(candidates), dtype=bool)
+
+    for i, c, g, k in zip(order.tolist(), cost[order].tolist(),
+                          group_codes[order].tolist(), custodian_codes[order].tolist()):
+        if c <= group_left[g] and c <= cap_left[k]:
+            group_left[g] -= c
+            cap_left[k] -= c
+            selected[i] = True
+
+    plan = candidates[selected].copy()
+    plan["Plan Score"] = scores[selected].round(4)
+    plan = plan.iloc[np.argsort(-ratio[selected], kind="stable")]
+    return plan[[col for col in PLAN_COLUMNS if col in plan.columns]]
+
+
+def summarize_plan(plan: pd.DataFrame, group_cols=("Custodian", "City")) -> pd.DataFrame:
+    """ملخص الخطة: عدد الأصول والتكلفة لكل (قسم، مدينة)"""
+    if plan.empty:
+        return pd.DataFrame()
+    summary = plan.groupby(list(group_cols)).agg({"Tag number": "count", "Cost": "sum"})
+    return summary.rename(columns={"Tag number": "عدد الأصول", "Cost": "التكلفة المخططة"})
+
+
+def export_plan(plan: pd.DataFrame) -> bytes:
+    """تصدير الخطة وملخصها إلى ملف Excel في الذاكرة"""
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        plan.to_excel(writer, sheet_name="Plan", index=False)
+        summarize_plan(plan).to_excel(writer, sheet_name="Summary")
+    return buffer.getvalue()
@@ -0,0 +1,107 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# كل الأعمدة التي تعتمد عليها التقارير وصفوف الملخص
+VIEW_COLUMNS = ["Tag number", "Maintenance Priority", "City", "Custodian", "Cost", "Net Book Value"]
+GROUPED_VIEWS = {"by_city": "City", "by_department": "Custodian"}
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """بصمة لكل صف من الأعمدة التي تعتمد عليها التقارير"""
+    columns = [col for col in VIEW_COLUMNS if col in df.columns]
+    return pd.util.hash_pandas_object(df[columns], index=False).to_numpy()
+
+
+class ReportViews:
+    """
+    تقارير مُجهزة مسبقاً (materialized views) لأنواع التقارير في صفحة التقارير.
+    كل تقرير محفوظ كمصفوفة مواقع صفوف مع صف ملخص، ويُعاد حسابه مرة واحدة لكل نسخة من البيانات.
+    الكائن مرتبط بالإطار الذي يفهرسه (self.df) ولا يتغير بعد إنشائه: refreshed() تُعيد كائناً جديداً،
+    وعند إضافة صفوف جديدة فقط تُبنى المصفوفات الجديدة تدريجياً بدل إعادة البناء الكامل.
+    """
+
+    def __init__(self, df: pd.DataFrame = None):
+        self.df = df if df is not None else pd.DataFrame()
+        self.version = None
+        self._hashes = np.array([], dtype=np.uint64)
+        self._views = {}
+        self._groups = {name: {} for name in GROUPED_VIEWS}
+        self._summaries = {}
+
+    def refreshed(self, df: pd.DataFrame) -> "ReportViews":
+        """تقارير للإطار df؛ تُعيد self إذا لم تتغير البيانات وإلا كائناً جديداً"""
+        hashes = row_hashes(df)
+        # بصمة مصفوفة البصمات نفسها، فتتغير النسخة مع أي تغيير في القيم أو ترتيب الصفوف
+        version = (len(hashes), hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest())
+        if version == self.version and df is self.df:
+            return self
+
+        views = ReportViews(df)
+        old_len = len(self._hashes)
+        if self.version is not None and len(hashes) >= old_len and np.array_equal(hashes[:old_len], self._hashes):
+            # نسخ سطحية: _append يستبدل المصفوفات ولا يعدّلها، فتبقى مصفوفات الكائن القديم كما هي
+            views._views = dict(self._views)
+            views._groups = {name: dict(groups) for name, groups in self._groups.items()}
+            views._append(old_len)
+        else:
+            views._rebuild()
+
+        views._hashes = hashes
+        views.version = version
+        return views
+
+    def _rebuild(self):
+        self._views = {"all": np.arange(len(self.df)), "high_priority": np.array([], dtype=np.int64)}
+        self._groups = {name: {} for name in GROUPED_VIEWS}
+        self._append(0)
+
+    def _append(self, start: int):
+        """إضافة مواقع الصفوف الجديدة (من start فصاعداً) إلى التقارير"""
+        df = self.df
+        new_rows = df.iloc[start:]
+        positions = np.arange(start, len(df))
+
+        self._views["all"] = np.arange(len(df))
+        high = positions[new_rows["Maintenance Priority"].to_numpy() == "عالي"]
+        self._views["high_priority"] = np.concatenate([self._views["high_priority"], high])
+
+        for name, column in GROUPED_VIEWS.items():
+            groups = self._groups[name]
+            for key, idx in new_rows.groupby(column, sort=False).indices.items():
+                groups[key] = np.concatenate([groups[key], positions[idx]]) if key in groups else positions[idx]
+
+        # الوسيط يتغير مع أي صف جديد، لذا تُعاد مقارنته بالكامل (عملية متجهية واحدة)
+        cost = df["Cost"].to_numpy(dtype=float)
+        median = np.median(cost) if len(cost) else 0
+        self._views["low_cost"] = np.flatnonzero(cost < median)
+        self._views["high_cost"] = np.flatnonzero(cost > median)
+
+    def group_keys(self, view: str) -> list:
+        return list(self._groups.get(view, {}).keys())
+
+    def indices(self, view: str, key=None) -> np.ndarray:
+        if view in self._groups:
+            return self._groups[view].get(key, np.array([], dtype=np.int64))
+        return self._views.get(view, np.array([], dtype=np.int64))
+
+    def summary(self, view: str, key=None) -> dict:
+        """صف الملخص للتقرير (يُحسب مرة واحدة لكل نسخة)"""
+        cache_key = (view, key)
+        if cache_key not in self._summaries:
+            rows = self.df.iloc[self.indices(view, key)]
+            self._summaries[cache_key] = {
+                'count': len(rows),
+                'total_cost': rows['Cost'].sum(),
+                'total_value': rows['Net Book Value'].sum(),
+            }
+        return self._summaries[cache_key]
+
+    def page(self, view: str, key=None, page: int = 1, page_size: int = 100) -> pd.DataFrame:
+        idx = self.indices(view, key)
+        start = max(page - 1, 0) * page_size
+        return self.df.iloc[idx[start:start + page_size]]
+
+    def page_count(self, view: str, key=None, page_size: int = 100) -> int:
+        return max(1, -(-len(self.indices(view, key)) // page_size))
@@ -0,0 +1,106 @@
+import threading
+import weakref
+from collections import OrderedDict, deque
+
+
+class SharedEntry:
+    """
+    نسخة واحدة مشتركة من البيانات المنظفة وما يُشتق منها (مدير الأصول، التقارير).
+    العناصر المنشورة لا تُعدّل بعد نشرها: التحديث يبني كائناً جديداً ويستبدل المرجع تحت القفل،
+    فتقرأ كل جلسة نسخة متسقة دون الحاجة إلى القفل.
+    """
+
+    def __init__(self, loader):
+        self.loader = loader
+        self.refs = 0
+        self.lock = threading.RLock()
+        self._items = {}
+
+    def get(self, name: str, default=None):
+        with self.lock:
+            return self._items.get(name, default)
+
+    def set(self, name: str, value):
+        with self.lock:
+            self._items[name] = value
+
+    def get_or_build(self, name: str, builder):
+        with self.lock:
+            if name not in self._items:
+                self._items[name] = builder()
+            return self._items[name]
+
+
+class DataLease:
+    """
+    حجز جلسة لعنصر في الذاكرة المشتركة؛ يُحرر تلقائياً عند حذف الجلسة
+    أو عند استبداله بحجز جديد.
+    """
+
+    def __init__(self, cache, key, entry):
+        self.key = key
+        self.entry = entry
+        self._finalizer = weakref.finalize(self, cache.release, key, entry)
+
+    def release(self):
+        self._finalizer()
+
+
+class SharedDataCache:
+    """
+    ذاكرة مشتركة على مستوى العملية لسجل الأصول مع عدّاد مراجع لكل نسخة بيانات.
+    النسخ غير المستخدمة (بدون مراجع) تُحذف بالأقدم أولاً عند تجاوز max_entries.
+    التحرير قد يُستدعى من جامع القمامة في أي لحظة (حتى داخل lease على نفس الخيط)،
+    لذا يُوضع في طابور ويُطبّق فقط عند إمكانية أخذ القفل.
+    """
+
+    def __init__(self, max_entries: int = 2):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._released = deque()
+
+    def lease(self, key, loader_factory) -> DataLease:
+        with self._lock:
+            self._apply_releases()
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = SharedEntry(loader_factory())
+                self._entries[key] = entry
+            entry.refs += 1
+            self._entries.move_to_end(key)
+            self._evict()
+        return DataLease(self, key, entry)
+
+    def release(self, key, entry):
+        self._released.append((key, entry))
+        # لا ننتظر القفل أبداً: إن كان مأخوذاً يُطبّق التحرير عند أول lease قادم
+        if self._lock.acquire(blocking=False):
+            try:
+                self._apply_releases()
+                self._evict()
+            finally:
+                self._lock.release()
+
+    def discard(self, key, entry):
+        """حذف نسخة فشل تحميلها حتى تُعاد المحاولة بمحمّل جديد عند الحجز التالي"""
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+    def _apply_releases(self):
+        while self._released:
+            key, entry = self._released.popleft()
+            # النسخة قد تكون حُذفت أو استُبدلت بنسخة جديدة بنفس المفتاح
+            if self._entries.get(key) is entry:
+                entry.refs = max(entry.refs - 1, 0)
+
+    def _evict(self):
+        idle = [key for key, entry in self._entries.items() if entry.refs == 0]
+        while len(self._entries) > self.max_entries and idle:
+            del self._entries[idle.pop(0)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._apply_releases()
+            return {key: entry.refs for key, entry in self._entries.items()}
@@ -0,0 +1,92 @@
+import os
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = "snapshots"
+KEY_COLUMN = "Tag number"
+SNAPSHOT_COLUMNS = [
+    "Tag number", "Asset Description", "City", "Custodian",
+    "Cost", "Net Book Value", "Remaining useful life",
+]
+TEXT_COLUMNS = {"Tag number", "Asset Description", "City", "Custodian"}
+
+
+class SnapshotStore:
+    """
+    حفظ نسخ شهرية من سجل الأصول بصيغة عمودية مضغوطة (npz، مصفوفة لكل عمود)
+    مفهرسة برقم الأصل، مع مقارنة سريعة بين أي نسختين.
+    """
+
+    def __init__(self, directory: str = SNAPSHOT_DIR):
+        self.directory = directory
+
+    def _path(self, label: str) -> str:
+        safe_label = re.sub(r"[^\w\-]", "_", label)
+        return os.path.join(self.directory, f"{safe_label}.npz")
+
+    def list_snapshots(self) -> list:
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted(name[:-4] for name in os.listdir(self.directory) if name.endswith(".npz"))
+
+    def mtime(self, label: str) -> float:
+        return os.path.getmtime(self._path(label))
+
+    def save(self, df: pd.DataFrame, label: str = None) -> str:
+        """حفظ السجل الحالي كنسخة؛ الاسم الافتراضي هو الشهر الحالي"""
+        label = label or datetime.now().strftime("%Y-%m")
+        columns = [col for col in SNAPSHOT_COLUMNS if col in df.columns]
+        frame = df[columns].drop_duplicates(subset=KEY_COLUMN, keep="last")
+
+        arrays = {}
+        for col in columns:
+            arrays[col] = frame[col].to_numpy().astype(str if col in TEXT_COLUMNS else float)
+
+        os.makedirs(self.directory, exist_ok=True)
+        np.savez_compressed(self._path(label), **arrays)
+        return label
+
+    def load(self, label: str) -> pd.DataFrame:
+        with np.load(self._path(label), allow_pickle=False) as data:
+            frame = pd.DataFrame({col: data[col] for col in data.files})
+        return frame.set_index(KEY_COLUMN)
+
+
+def diff_snapshots(old: pd.DataFrame, new: pd.DataFrame) -> dict:
+    """
+    مقارنة نسختين مفهرستين برقم الأصل بعمليات متجهية:
+    الأصول المضافة، المستبعدة، المنقولة بين الجهات، والتغير في القيمة الدفترية.
+    """
+    added = new.loc[new.index.difference(old.index)]
+    retired = old.loc[old.index.difference(new.index)]
+
+    common = new.index.intersection(old.index)
+    old_common = old.loc[common]
+    new_common = new.loc[common]
+
+    transfer_mask = old_common["Custodian"].to_numpy() != new_common["Custodian"].to_numpy()
+    transfers = pd.DataFrame({
+        "Asset Description": new_common["Asset Description"].to_numpy()[transfer_mask],
+        "من": old_common["Custodian"].to_numpy()[transfer_mask],
+        "إلى": new_common["Custodian"].to_numpy()[transfer_mask],
+    }, index=common[transfer_mask])
+
+    nbv_delta = new_common["Net Book Value"].to_numpy() - old_common["Net Book Value"].to_numpy()
+    nbv_mask = nbv_delta != 0
+    nbv_changes = pd.DataFrame({
+        "Asset Description": new_common["Asset Description"].to_numpy()[nbv_mask],
+        "القيمة السابقة": old_common["Net Book Value"].to_numpy()[nbv_mask],
+        "القيمة الحالية": new_common["Net Book Value"].to_numpy()[nbv_mask],
+        "الفرق": nbv_delta[nbv_mask],
+    }, index=common[nbv_mask])
+
+    return {
+        "added": added,
+        "retired": retired,
+        "transfers": transfers,
+        "nbv_changes": nbv_changes,
+        "nbv_total_delta": float(nbv_delta.sum()),
+    }